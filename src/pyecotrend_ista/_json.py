@@ -0,0 +1,9 @@
+"""JSON decoding for PyEcotrendIsta."""  # numpydoc ignore=EX01,ES01
+
+# orjson is an optional speedup (the `speedups` extra), this is the single place choosing the JSON decoder
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
+__all__ = ["json_loads"]
@@ -18,3 +18,12 @@ GRANT_TYPE_REFRESH_TOKEN = "refresh_token"
 GRANT_TYPE_AUTHORIZATION_CODE = "authorization_code"
 
 TIMEOUT = 10
+
+# Seconds before their expiry at which access tokens are considered expired, capped at half of
+# the token lifetime so that short-lived tokens are not treated as expired right away
+TOKEN_EXPIRY_MARGIN = 30
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/101.0.4951.67"
+    " Safari/537.36"
+)
@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
-import html
+from html.parser import HTMLParser
 import logging
-import re
+import random
+import threading
+import time
 from typing import Any, cast
 import urllib.parse
 
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
+from ._json import json_loads
 from .const import (
     CLIENT_ID,
     DEMO_USER_ACCOUNT,
@@ -22,6 +25,7 @@ from .const import (
     RESPONSE_TPYE,
     SCOPE,
     TIMEOUT,
+    TOKEN_EXPIRY_MARGIN,
 )
 from .exception_classes import (
     KeycloakAuthenticationError,
@@ -33,6 +37,187 @@ from .exception_classes import (
 )
 from .types import GetTokenResponse
 
+_AUTH_URL = f"{PROVIDER_URL}auth"
+_TOKEN_URL = f"{PROVIDER_URL}token"
+_USERINFO_URL = f"{PROVIDER_URL}userinfo"
+_LOGOUT_URL = f"{PROVIDER_URL}logout"
+
+# The query of the auth request never changes, so it is encoded once
+_AUTH_URL_WITH_QUERY = (
+    _AUTH_URL
+    + "?"
+    + urllib.parse.urlencode(
+        {
+            "response_mode": RESPONSE_MODE,  # fragment
+            "response_type": RESPONSE_TPYE,  # code
+            "client_id": CLIENT_ID,
+            "scope": SCOPE,
+            "redirect_uri": REDIRECT_URI,
+        }
+    )
+)
+
+# Form bodies of the token, refresh and logout requests only differ in the code or refresh token,
+# so the constant part is encoded once and the variable part is appended per request.
+_FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+_GET_TOKEN_BODY = (
+    urllib.parse.urlencode({"grant_type": GRANT_TYPE_AUTHORIZATION_CODE, "client_id": CLIENT_ID, "redirect_uri": REDIRECT_URI})
+    + "&code="
+)
+_REFRESH_TOKEN_BODY = (
+    urllib.parse.urlencode({"grant_type": GRANT_TYPE_REFRESH_TOKEN, "client_id": CLIENT_ID}) + "&refresh_token="
+)
+_LOGOUT_BODY = urllib.parse.urlencode({"client_id": CLIENT_ID}) + "&refresh_token="
+
+
+class _JitteredRetry(Retry):  # numpydoc ignore=ES01,EX01,PR01
+    """Retry policy using exponential backoff with full jitter.
+
+    Spreading the delays randomly over the whole backoff interval keeps many clients from
+    retrying in lockstep after a Keycloak outage.
+    """
+
+    def get_backoff_time(self) -> float:  # numpydoc ignore=ES01,EX01
+        """Return a random backoff time up to the exponential backoff of urllib3.
+
+        Returns
+        -------
+        float
+            Time in seconds to sleep before the next attempt.
+        """
+        return random.uniform(0, super().get_backoff_time())
+
+    def parse_retry_after(self, retry_after: str) -> float:  # numpydoc ignore=ES01,EX01
+        """Return the delay requested by a Retry-After header, capped at `_MAX_RETRY_AFTER`.
+
+        Parameters
+        ----------
+        retry_after : str
+            Value of the Retry-After header, in seconds or as an HTTP date.
+
+        Returns
+        -------
+        float
+            Time in seconds to sleep before the next attempt.
+        """
+        return min(super().parse_retry_after(retry_after), _MAX_RETRY_AFTER)
+
+
+# Upper bound for the delay requested by a Retry-After header, the server may ask for minutes
+_MAX_RETRY_AFTER = 2.0
+
+
+# Keep the worst-case blocking time of a failing request short (at most 0.6 + 1.2 s of backoff
+# for three attempts, or 3 * `_MAX_RETRY_AFTER` if the server sends Retry-After), the client
+# is usually called synchronously from a worker thread.
+# Once retries are exhausted the last response is returned and handled by `_send_request`.
+# `Retry` is immutable (urllib3 creates a new object per attempt), so it is shared by all sessions.
+# None of the POST requests is idempotent: the login form consumes the login session, the token
+# request the single-use authorization code and the refresh request the rotated refresh token.
+# POSTs are therefore only retried if the connection failed, i.e. nothing reached the server.
+_RETRY = _JitteredRetry(
+    total=3,
+    backoff_factor=0.3,
+    # 500 is only safe to retry because POSTs are excluded from status retries
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=frozenset(["GET"]),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# Status codes `raise_error_from_response` accepts unless told otherwise
+_DEFAULT_EXPECTED_CODES = frozenset({200, 201, 204})
+
+# Maximum number of login forms submitted before giving up
+_MAX_FORM_SUBMISSIONS = 3
+
+# Keycloak's login theme shows rejected credentials in the element with this id
+_INVALID_CREDENTIALS_MARKER = b'id="input-error"'
+
+
+class _FormActionFound(Exception):  # noqa: N818  numpydoc ignore=ES01,EX01
+    """Raised to stop parsing once the form action has been found."""
+
+
+class _FormActionParser(HTMLParser):  # numpydoc ignore=ES01,EX01
+    """HTML parser looking for the action URL of the first form in a document.
+
+    Attributes
+    ----------
+    action : str or None
+        Action URL of the first form which has one, None if no such form was found.
+    """
+
+    def __init__(self) -> None:  # numpydoc ignore=ES01,EX01
+        """Initialize the parser."""
+        super().__init__()
+        self.action: str | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:  # numpydoc ignore=ES01,EX01
+        """Record the action of a form start tag and stop parsing.
+
+        Parameters
+        ----------
+        tag : str
+            Name of the tag, converted to lower case.
+        attrs : list[tuple[str, str | None]]
+            Attributes of the tag, with character references already unescaped.
+
+        Raises
+        ------
+        _FormActionFound
+            When a form with an action attribute has been found.
+        """
+        if tag == "form":
+            for name, value in attrs:
+                if name == "action" and value:
+                    self.action = value
+                    raise _FormActionFound
+
+
+def _find_form_action(content: bytes) -> str | None:  # numpydoc ignore=ES01,EX01
+    """Extract the action URL of the first form from an HTML document.
+
+    Parameters
+    ----------
+    content : bytes
+        UTF-8 encoded HTML document to search.
+
+    Returns
+    -------
+    str or None
+        The unescaped action URL, or None if the document contains no form with an action.
+
+    Notes
+    -----
+    Form tags inside comments or scripts are skipped, the parser stops at the first form
+    with an action.
+    """
+    parser = _FormActionParser()
+    try:
+        parser.feed(content.decode(errors="replace"))
+    except _FormActionFound:
+        pass
+    return parser.action
+
+
+def _form_target(action: str) -> str:  # numpydoc ignore=ES01,EX01
+    """Return a form action URL without the `session_code` query parameter.
+
+    Parameters
+    ----------
+    action : str
+        Action URL of a Keycloak login form.
+
+    Returns
+    -------
+    str
+        The action URL without `session_code`, which Keycloak renews on every rendering of a form.
+    """
+    url = urllib.parse.urlsplit(action)
+    query = [(key, value) for key, value in urllib.parse.parse_qsl(url.query) if key != "session_code"]
+    return url._replace(query=urllib.parse.urlencode(query)).geturl()
+
 
 class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
     """Login helper for Keycloak.
@@ -45,12 +230,8 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
         Username for authentication.
     password : str
         Password for authentication.
-    cookie : str
-        Authentication cookie.
     auth_code : str
         Authorization code.
-    form_action : str
-        Form action URL for authentication.
 
     Notes
     -----
@@ -59,10 +240,10 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
 
     """
 
+    __slots__ = ("_refresh_cache", "_refresh_lock", "auth_code", "logger", "password", "session", "totp", "username")
+
     session: requests.Session
-    cookie: str
     auth_code: str
-    form_action: str
 
     def __init__(
         self,
@@ -83,7 +264,8 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
         totp : str, optional
             Time-based One-Time Password if enabled, by default None.
         session : requests.Session, optional
-            Optional session object for making HTTP requests, by default None.
+            Optional session object for making HTTP requests, by default None. It is used without
+            changing its configuration.
         logger : logging.Logger, optional
             Logger object for logging messages, by default None.
 
@@ -92,15 +274,25 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
         self.password: str = password
         self.totp: str | None = totp
 
-        self.session = session or requests.Session()
-
-        self.session.verify = True
-        retries = Retry(total=5, backoff_factor=1, status_forcelist=[502, 503, 504, 408])
-        self.session.mount("https://", HTTPAdapter(max_retries=retries))
+        # A session passed in by the caller is used as is, its adapters and TLS settings are the caller's choice
+        if session is None:
+            session = requests.Session()
+            # The client talks to two hosts (Keycloak and the ista API); a larger pool per host keeps
+            # connections of concurrent requests alive instead of discarding them after use.
+            session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY))
+        self.session = session
 
         self.logger = logger or logging.getLogger(__name__)
 
-    def _send_request(self, method, url, **kwargs) -> requests.Response:  # numpydoc ignore=ES01,EX01
+        self._refresh_lock = threading.Lock()
+        # Maps the refresh token used for the last refresh to the monotonic expiry time of the access
+        # token obtained with it, the time from which on it is no longer served, the access token
+        # and the new refresh token
+        self._refresh_cache: dict[str, tuple[float, float, str, str]] = {}
+
+    def _send_request(
+        self, method, url, error=KeycloakOperationError, **kwargs
+    ) -> requests.Response:  # numpydoc ignore=ES01,EX01
         """Send an HTTP request using the session object.
 
         Parameters
@@ -109,8 +301,11 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
             HTTP method for the request (e.g., 'GET', 'POST', 'PUT', 'DELETE').
         url : str
             URL to send the request to.
+        error : type[KeycloakError], optional
+            Exception class raised if the server responds with a 4xx or 5xx status code,
+            by default KeycloakOperationError.
         **kwargs : dict
-            Additional keyword arguments to pass to `session.request`.
+            Additional keyword arguments to pass to `session.request`. The timeout defaults to `TIMEOUT`.
 
         Returns
         -------
@@ -121,16 +316,23 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
         ------
         ValueError
             If `self.session` is not initialized (i.e., is `None`).
+        KeycloakError
+            If the server responds with an error status code (see `raise_error_from_response`).
         KeycloakOperationError
             If an HTTP request exception (`requests.RequestException`) occurs.
 
         """
         if self.session is None:
             raise ValueError("Session object is not initialized.")
+        kwargs.setdefault("timeout", TIMEOUT)
         try:
             response = self.session.request(method, url, **kwargs)
-            self.logger.debug("Performed %s request: %s [%s]:\n%s", method, url, response.status_code, response.text[:100])
+            # Decoding the response body is only worth it if the message is emitted
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Performed %s request: %s [%s]:\n%s", method, url, response.status_code, response.text[:100])
             response.raise_for_status()
+        except requests.HTTPError as e:
+            raise_error_from_response(e.response, error)
         except requests.RequestException as e:
             raise KeycloakOperationError from e
 
@@ -166,51 +368,72 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
             If the authentication code ('code') is not found in the redirection URL parameters.
 
         """
-        cookie, form_action = self._get_cookie_and_action()
-
-        resp: requests.Response = self._send_request(
-            "POST",
-            form_action,
-            data={
-                "username": self.username,
-                "password": self.password,
-                "login": "Login",
-                "credentialId": None,
-            },
-            headers={"Cookie": cookie},
-            timeout=TIMEOUT,
-            allow_redirects=False,
-        )
-
-        # If the response code is not 302
-        # raise_error_from_response(resp, KeycloakAuthenticationError, expected_codes=[302])
-        if resp.status_code != 302:
-            if resp.status_code == 200:
-                form_action = re.search(r'<form\s+.*?\s+action="(.*?)"', resp.text, re.DOTALL)
-                if form_action and form_action.group(1):
-                    self._login()
-            else:
+        form_action = self._get_form_action()
+        restarted = False
+
+        for _ in range(_MAX_FORM_SUBMISSIONS):
+            resp: requests.Response = self._send_request(
+                "POST",
+                form_action,
+                error=KeycloakAuthenticationError,
+                data={
+                    "username": self.username,
+                    "password": self.password,
+                    "login": "Login",
+                    "credentialId": None,
+                },
+                allow_redirects=False,
+            )
+
+            # A 302 redirect carries the authentication code
+            if resp.status_code == 302:
+                break
+            if resp.status_code != 200:
                 raise_error_from_response(resp, KeycloakAuthenticationError)
+                break
+
+            # Resubmitting rejected credentials would only count towards Keycloak's brute force detection
+            if _INVALID_CREDENTIALS_MARKER in resp.content:
+                raise KeycloakAuthenticationError("Invalid username or password", response_code=resp.status_code)
+
+            # Keycloak rendered another form, submit the credentials to its action
+            next_form_action = _find_form_action(resp.content)
+            if not next_form_action:
+                break
+            # The same form without an error means the login session expired or its cookie was
+            # missing, restart the login once with a fresh login page and cookies
+            if _form_target(next_form_action) == _form_target(form_action):
+                if restarted:
+                    break
+                restarted = True
+                next_form_action = self._get_form_action()
+                if not next_form_action:
+                    break
+            form_action = next_form_action
 
         # If Location header is not present raise exception.
-        if "Location" not in resp.headers:
+        redirect = resp.headers.get("Location")
+        if redirect is None:
             raise KeycloakCodeNotFound("header[Location] not found", response_code=resp.status_code)
-        redirect = resp.headers["Location"]
-        query = urllib.parse.urlparse(redirect).fragment
-        redirect_params = urllib.parse.parse_qs(query)
 
-        # If code is not in redirect_params or len redirect_params code is less than 1
-        if "code" not in redirect_params or len(redirect_params["code"]) < 1:
-            raise KeycloakCodeNotFound("header[Location] Code not found", response_code=resp.status_code)
-        return redirect_params["code"][0]
+        # The code is a parameter of the fragment, e.g. `#state=...&session_state=...&code=...`
+        for param in redirect.partition("#")[2].split("&"):
+            if param.startswith("code="):
+                if code := urllib.parse.unquote(param[5:]):
+                    return code
+                break
+        raise KeycloakCodeNotFound("header[Location] Code not found", response_code=resp.status_code)
 
-    def _get_cookie_and_action(self) -> tuple:  # numpydoc ignore=ES01,EX01
-        """Retrieve the cookie and action URL from the OpenID Connect provider.
+    def _get_form_action(self) -> str | None:  # numpydoc ignore=EX01
+        """Retrieve the login form action URL from the OpenID Connect provider.
+
+        The session cookies set by the provider are kept in the session's cookie jar
+        and sent along with the subsequent login request.
 
         Returns
         -------
-        tuple[str, str]
-            A tuple containing the cookie obtained from the response headers and the action URL extracted from the HTML form.
+        str or None
+            The action URL extracted from the HTML form, or None if no form was found.
 
         Raises
         ------
@@ -218,30 +441,14 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
             If the GET request to the OpenID Connect provider returns a non-200 status code.
 
         """
-        form_action = None
         resp: requests.Response = self._send_request(
             "GET",
-            url=f"{PROVIDER_URL}auth",
-            params={
-                "response_mode": RESPONSE_MODE,  # fragment
-                "response_type": RESPONSE_TPYE,  # code
-                "client_id": CLIENT_ID,
-                "scope": SCOPE,
-                "redirect_uri": REDIRECT_URI,
-            },
-            timeout=TIMEOUT,
+            url=_AUTH_URL_WITH_QUERY,
+            error=KeycloakGetError,
             allow_redirects=False,
         )
 
-        # If the response code is not 200 raise an exception.
-        raise_error_from_response(resp, KeycloakGetError)
-
-        cookie = resp.headers["Set-Cookie"]
-        cookie = "; ".join(c.split(";")[0] for c in cookie.split(", "))
-        search = re.search(r'<form\s+.*?\s+action="(.*?)"', resp.text, re.DOTALL)
-        if search:
-            form_action = html.unescape(search.group(1))
-        return cookie, form_action
+        return _find_form_action(resp.content)
 
     def refresh_token(self, refresh_token) -> tuple:  # numpydoc ignore=ES01,EX01
         """Refresh the access token using the provided refresh token.
@@ -256,20 +463,58 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
         tuple[str, int, str]
             Tuple containing the refreshed access token, its expiration time in seconds,
             and the new refresh token.
+
+        Notes
+        -----
+        The result of the last refresh is cached for the lifetime of the access token. Concurrent
+        or repeated calls with the same refresh token return the cached tokens instead of issuing
+        another request, which Keycloak would reject once the refresh token has been rotated. The
+        expiration time returned for cached tokens is their remaining lifetime.
         """
-        resp: requests.Response = self._send_request(
-            "POST",
-            url=f"{PROVIDER_URL}token",
-            data={
-                "grant_type": GRANT_TYPE_REFRESH_TOKEN,
-                "client_id": CLIENT_ID,  # ecotrend
-                "refresh_token": refresh_token,
-            },
-        )
+        if cached := self._get_cached_refresh(refresh_token):
+            return cached
+
+        with self._refresh_lock:
+            # Another thread may have refreshed the token while waiting for the lock
+            if cached := self._get_cached_refresh(refresh_token):
+                return cached
+
+            resp: requests.Response = self._send_request(
+                "POST",
+                url=_TOKEN_URL,
+                data=(_REFRESH_TOKEN_BODY + urllib.parse.quote_plus(refresh_token or "")).encode(),
+                headers=_FORM_HEADERS,
+            )
 
-        result = resp.json()
+            data = json_loads(resp.content)
+            expires_at = time.monotonic() + data["expires_in"]
+            stale_at = expires_at - min(TOKEN_EXPIRY_MARGIN, data["expires_in"] // 2)
+            self._refresh_cache = {refresh_token: (expires_at, stale_at, data["access_token"], data["refresh_token"])}
 
-        return result["access_token"], result["expires_in"], result["refresh_token"]
+        return data["access_token"], data["expires_in"], data["refresh_token"]
+
+    def _get_cached_refresh(self, refresh_token) -> tuple[str, int, str] | None:  # numpydoc ignore=ES01,EX01
+        """Return the cached result of a refresh with the given refresh token.
+
+        Parameters
+        ----------
+        refresh_token : str
+            The refresh token passed to `refresh_token`.
+
+        Returns
+        -------
+        tuple[str, int, str] or None
+            Tuple containing the cached access token, its remaining lifetime in seconds and the
+            new refresh token, or None if there is no cached result which is still valid.
+        """
+        cached = self._refresh_cache.get(refresh_token)
+        if cached is None:
+            return None
+        expires_at, stale_at, access_token, new_refresh_token = cached
+        now = time.monotonic()
+        if now >= stale_at:
+            return None
+        return access_token, int(expires_at - now), new_refresh_token
 
     def get_token(self) -> GetTokenResponse:  # numpydoc ignore=ES01,EX01
         """Retrieve access and refresh tokens using the obtained authorization code.
@@ -290,28 +535,23 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
 
         """
         self._login()
-        _data = {
-            "grant_type": GRANT_TYPE_AUTHORIZATION_CODE,
-            "client_id": CLIENT_ID,  # ecotrend
-            "redirect_uri": REDIRECT_URI,
-            "code": self.auth_code,
-        }
+        _data = _GET_TOKEN_BODY + urllib.parse.quote_plus(self.auth_code)
         if self.totp:
-            _data["totp"] = self.totp
+            _data += "&totp=" + urllib.parse.quote_plus(self.totp)
         resp: requests.Response = self._send_request(
             "POST",
-            url=f"{PROVIDER_URL}token",
-            data=_data,
-            timeout=TIMEOUT,
+            url=_TOKEN_URL,
+            error=KeycloakPostError,
+            data=_data.encode(),
+            headers=_FORM_HEADERS,
             allow_redirects=False,
         )
 
-        raise_error_from_response(response=resp, error=KeycloakPostError)
         # If the response code is not 200 raise an exception.
         if resp.status_code != 200:
             raise KeycloakInvalidTokenError()
 
-        return cast(GetTokenResponse, resp.json())
+        return cast(GetTokenResponse, json_loads(resp.content))
 
     def userinfo(self, token) -> Any:  # numpydoc ignore=EX01
         """Retrieve user information from the Keycloak provider.
@@ -339,11 +579,10 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
             return {}
 
         header = {"Authorization": f"Bearer {token}"}
-        url = f"{PROVIDER_URL}userinfo"
 
-        resp: requests.Response = self._send_request("GET", url=url, headers=header)
+        resp: requests.Response = self._send_request("GET", url=_USERINFO_URL, headers=header)
 
-        return resp.json()
+        return json_loads(resp.content)
 
     def logout(self, token) -> dict | Any | bytes | dict[str, str]:  # numpydoc ignore=ES01,EX01
         """Log out the user session from the identity provider.
@@ -356,7 +595,7 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
         Returns
         -------
         Union[dict, Any, bytes, dict[str, str]]
-            Response data from the logout request. The exact type may vary based on the response content.
+            An empty dictionary if the server responded without content, the raw response body otherwise.
 
         Raises
         ------
@@ -364,20 +603,21 @@ class LoginHelper:  # numpydoc ignore=ES01,EX01,PR01
             If an error occurs during the POST request to logout the user.
 
         """
+        # Tokens of the ended session must not be served from the cache anymore
+        self._refresh_cache = {}
         resp: requests.Response = self._send_request(
             "POST",
-            url=f"{PROVIDER_URL}logout",
-            data={
-                "client_id": CLIENT_ID,
-                "refresh_token": token,
-            },
+            url=_LOGOUT_URL,
+            error=KeycloakPostError,
+            data=(_LOGOUT_BODY + urllib.parse.quote_plus(token or "")).encode(),
+            headers=_FORM_HEADERS,
         )
 
-        return raise_error_from_response(resp, KeycloakPostError)
+        return raise_error_from_response(resp, KeycloakPostError, decode_json=False)
 
 
 def raise_error_from_response(
-    response: requests.Response, error, expected_codes=None, skip_exists=False
+    response: requests.Response, error, expected_codes=None, skip_exists=False, decode_json=True
 ) -> dict | Any | bytes | dict[str, str]:  # numpydoc ignore=ES01,EX01
     """Raise an exception for the response.
 
@@ -391,6 +631,9 @@ def raise_error_from_response(
         Set of expected codes, which should not raise the exception.
     skip_exists : bool, optional
         Indicates whether the response on already existing object should be ignored.
+    decode_json : bool, optional
+        Whether to decode the body of a successful response as JSON. If False, the raw
+        content is returned, which saves the decoding for callers discarding the result.
 
     Returns
     -------
@@ -407,29 +650,36 @@ def raise_error_from_response(
     Source from https://github.com/marcospereirampj/python-keycloak/blob/c98189ca6951f12f1023ed3370c9aaa0d81e4aa4/src/keycloak/exceptions.py
     """  # noqa: DAR401,DAR402 pylint: disable=line-too-long
     if expected_codes is None:
-        expected_codes = [200, 201, 204]
+        expected_codes = _DEFAULT_EXPECTED_CODES
 
-    if response.status_code in expected_codes:
-        if response.status_code == requests.codes["no_content"]:
+    status_code = response.status_code
+    if status_code in expected_codes:
+        if status_code == 204:
             return {}
 
+        body = response.content
+        if not decode_json:
+            return body
+
         try:
-            return response.json()
+            return json_loads(body)
         except ValueError:
-            return response.content
+            return body
 
-    if skip_exists and response.status_code == 409:
+    if skip_exists and status_code == 409:
         return {"msg": "Already exists"}
 
+    # The body is read once and decoded at most once, error pages can be large
+    body = response.content
     try:
-        message = response.json()["message"]
-    except (KeyError, ValueError):
-        message = response.content
+        message = json_loads(body)["message"]
+    except (KeyError, TypeError, ValueError):
+        message = body
 
     if isinstance(error, dict):
-        error = error.get(response.status_code, KeycloakOperationError)
+        error = error.get(status_code, KeycloakOperationError)
     else:
-        if response.status_code == 401:
+        if status_code == 401:
             error = KeycloakAuthenticationError
 
-    raise error(error_message=message, response_code=response.status_code, response_body=response.content)
+    raise error(error_message=message, response_code=status_code, response_body=body)
@@ -13,13 +13,15 @@ from __future__ import annotations
 
 from http import HTTPStatus
 import logging
+import math
 import time
 from typing import Any, cast
 import warnings
 
 import requests
 
-from .const import API_BASE_URL, DEMO_USER_ACCOUNT, VERSION
+from ._json import json_loads
+from .const import API_BASE_URL, DEMO_USER_ACCOUNT, TOKEN_EXPIRY_MARGIN, USER_AGENT, VERSION
 from .exception_classes import KeycloakError, LoginError, ParserError, ServerError, deprecated
 from .helper_object_de import CustomRaw
 from .login_helper import LoginHelper
@@ -27,6 +29,11 @@ from .types import AccountResponse, ConsumptionsResponse, ConsumptionUnitDetails
 
 _LOGGER = logging.getLogger(__name__)
 
+_ACCOUNT_URL = f"{API_BASE_URL}account"
+_CONSUMPTIONS_URL = f"{API_BASE_URL}consumptions"
+_MENU_URL = f"{API_BASE_URL}menu"
+_DEMO_USER_TOKEN_URL = f"{API_BASE_URL}demo-user-token"
+
 
 class PyEcotrendIsta:  # numpydoc ignore=PR01
     """
@@ -51,7 +58,9 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
     _support_code : str | None
         The support code for the account.
     _start_timer : float
-        The start time for tracking elapsed time.
+        The monotonic clock time at which the access token was set.
+    _access_token_deadline : float
+        The monotonic clock time from which on the access token is refreshed.
 
     Examples
     --------
@@ -66,9 +75,10 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
     _access_token: str | None = None
     _refresh_token: str | None = None
     _access_token_expires_in: int = 0
-    _header: dict[str, str] = {}
+    _header: dict[str, str]
     _support_code: str | None = None
     _start_timer: float = 0.0
+    _access_token_deadline: float = math.inf
 
     def __init__(
         self,
@@ -122,6 +132,8 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         )
 
         self.session: requests.Session = self.loginhelper.session
+        # All API requests are GETs without a body, so no Content-Type is sent
+        self._header = {"User-Agent": self.get_user_agent()}
 
     @property
     def access_token(self):  # numpydoc ignore=EX01
@@ -130,7 +142,7 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
 
         This property checks if the access token is still valid. If the token has expired and the client is connected,
         it refreshes the token. The token is considered expired if the current time minus the start time exceeds the
-        token's expiration period.
+        token's expiration period less a safety margin.
 
         Returns
         -------
@@ -141,12 +153,8 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         -----
         This method will automatically refresh the access token if it has expired.
         """
-        if (
-            self._access_token_expires_in > 0
-            and self._is_connected()
-            and self._refresh_token
-            and self._access_token_expires_in <= time.time() - self._start_timer
-        ):
+        # The deadline is computed once per token, so a fresh token costs a single clock read
+        if self._access_token_deadline <= time.monotonic() and self._is_connected() and self._refresh_token:
             self.__refresh()
         return self._access_token
 
@@ -167,11 +175,10 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         tracking the token's validity period.
         """
         self._access_token = value
-        self._start_timer = time.time()
-        _LOGGER.debug(
-            "Initialized start timer for refresh token at %s",
-            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self._start_timer)),
-        )
+        # The monotonic clock is not affected by system clock changes while the token is valid
+        self._start_timer = time.monotonic()
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Initialized start timer for refresh token at %s", time.strftime("%Y-%m-%d %H:%M:%S"))
 
     def _is_connected(self) -> bool:  # numpydoc ignore=ES01,EX01
         """
@@ -184,6 +191,24 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         """
         return bool(self._access_token)
 
+    def __set_access_token_deadline(self) -> None:  # numpydoc ignore=ES01,EX01
+        """
+        Compute the time at which the current access token needs to be refreshed.
+
+        Notes
+        -----
+        The token is refreshed `TOKEN_EXPIRY_MARGIN` seconds, but at most half of its lifetime,
+        before it expires, so that requests sent with it do not race the expiry on the server.
+        Without a known lifetime it is never refreshed.
+        """
+        self._access_token_deadline = (
+            self._start_timer
+            + self._access_token_expires_in
+            - min(TOKEN_EXPIRY_MARGIN, self._access_token_expires_in // 2)
+            if self._access_token_expires_in > 0
+            else math.inf
+        )
+
     def __login(self) -> str | None:  # numpydoc ignore=ES01,EX01
         """
         Perform the login process to obtain an access token.
@@ -205,6 +230,7 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
             self.access_token = token["access_token"]
             self._access_token_expires_in = token["expires_in"]
             self._refresh_token = token["refresh_token"]
+            self.__set_access_token_deadline()
             return self.access_token
         return None
 
@@ -233,6 +259,7 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
             self._access_token_expires_in,
             self._refresh_token,
         ) = self.loginhelper.refresh_token(self._refresh_token)
+        self.__set_access_token_deadline()
 
         self._header["Authorization"] = f"Bearer {self.access_token}"
 
@@ -253,19 +280,16 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         ServerError
             If the request fails due to a server error, timeout, or other request exceptions.
         """
-        self._header = {
-            "Content-Type": "application/json",
-            "User-Agent": self.get_user_agent(),
-            "Authorization": f"Bearer {self.access_token}",
-        }
-        url = f"{API_BASE_URL}account"
+        self._header["Authorization"] = f"Bearer {self.access_token}"
+        url = _ACCOUNT_URL
         try:
             with self.session.get(url, headers=self._header) as r:
-                _LOGGER.debug("Performed GET request: %s [%s]:\n%s", url, r.status_code, r.text)
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Performed GET request: %s [%s]:\n%s", url, r.status_code, r.text)
                 r.raise_for_status()
                 try:
-                    data = r.json()
-                except requests.JSONDecodeError as exc:
+                    data = json_loads(r.content)
+                except ValueError as exc:
                     raise ParserError(
                         "Loading account information failed due to an error parsing the request response"
                     ) from exc
@@ -904,18 +928,19 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         >>> print(data)
         """
         params = {"consumptionUnitUuid": obj_uuid or self._uuid}
-        url = f"{API_BASE_URL}consumptions"
+        url = _CONSUMPTIONS_URL
         try:
             with self.session.get(
                 url,
                 params=params,
                 headers=self._header,
             ) as result:
-                _LOGGER.debug("Performed GET request: %s [%s]:\n%s", url, result.status_code, result.text[:100])
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Performed GET request: %s [%s]:\n%s", url, result.status_code, result.text[:100])
                 result.raise_for_status()
                 try:
-                    return cast(ConsumptionsResponse, result.json())
-                except requests.JSONDecodeError as exc:
+                    return cast(ConsumptionsResponse, json_loads(result.content))
+                except ValueError as exc:
                     raise ParserError("Loading consumption data failed due to an error parsing the request response") from exc
         except requests.HTTPError as exc:
             if exc.response.status_code == HTTPStatus.UNAUTHORIZED:
@@ -952,15 +977,16 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         ServerError
             If there is a server error, connection timeout, or request exception.
         """
-        url = f"{API_BASE_URL}menu"
+        url = _MENU_URL
         try:
             with self.session.get(url, headers=self._header) as r:
-                _LOGGER.debug("Performed GET request: %s [%s]:\n%s", url, r.status_code, r.text)
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Performed GET request: %s [%s]:\n%s", url, r.status_code, r.text)
 
                 r.raise_for_status()
                 try:
-                    return cast(ConsumptionUnitDetailsResponse, r.json())
-                except requests.JSONDecodeError as exc:
+                    return cast(ConsumptionUnitDetailsResponse, json_loads(r.content))
+                except ValueError as exc:
                     raise ParserError(
                         "Loading consumption unit details failed due to an error parsing the request response"
                     ) from exc
@@ -1003,10 +1029,7 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         -----
         This method provides a static User-Agent string commonly used for web browsers.
         """
-        return (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/101.0.4951.67"
-            " Safari/537.36"
-        )
+        return USER_AGENT
 
     def demo_user_login(self) -> GetTokenResponse:  # numpydoc ignore=ES01,EX01
         """
@@ -1025,19 +1048,19 @@ class PyEcotrendIsta:  # numpydoc ignore=PR01
         ServerError
             If there is a server error, connection timeout, or request exception.
         """
-        url = f"{API_BASE_URL}demo-user-token"
+        url = _DEMO_USER_TOKEN_URL
         try:
-            self._header["User-Agent"] = self.get_user_agent()
             with self.session.get(url, headers=self._header) as r:
-                _LOGGER.debug("Performed GET request %s [%s]:\n%s", url, r.status_code, r.text)
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Performed GET request %s [%s]:\n%s", url, r.status_code, r.text)
 
                 r.raise_for_status()
                 try:
-                    data = r.json()
+                    data = json_loads(r.content)
                     key = iter(GetTokenResponse.__annotations__)
                     token = {next(key): value for value in data.values()}
                     return cast(GetTokenResponse, token)
-                except requests.JSONDecodeError as exc:
+                except ValueError as exc:
                     raise ParserError("Demo user authentication failed due to an error parsing the request response") from exc
         except requests.HTTPError as exc:
             raise ServerError(
@@ -8,6 +8,7 @@ from requests_mock.mocker import Mocker as RequestsMock
 
 from pyecotrend_ista import PyEcotrendIsta
 from pyecotrend_ista.const import API_BASE_URL, DEMO_USER_ACCOUNT, PROVIDER_URL
+from pyecotrend_ista.login_helper import LoginHelper
 
 TEST_EMAIL = "max.istamann@test.com"
 DEMO_EMAIL = DEMO_USER_ACCOUNT
@@ -31,6 +32,12 @@ def ista_client(request) -> PyEcotrendIsta:
     return ista
 
 
+@pytest.fixture
+def login_helper() -> LoginHelper:
+    """Create LoginHelper instance."""
+    return LoginHelper(username=TEST_EMAIL, password=TEST_PASSWORD)
+
+
 @pytest.fixture
 def mock_requests_login(requests_mock: RequestsMock) -> RequestsMock:
     """Mock requests to Login Endpoints."""
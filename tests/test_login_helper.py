@@ -0,0 +1,398 @@
+"""Tests for LoginHelper."""
+
+from http import HTTPStatus
+
+import pytest
+import requests
+from requests_mock.mocker import Mocker as RequestsMock
+from urllib3 import HTTPResponse
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+from urllib3.util.retry import RequestHistory
+
+from pyecotrend_ista import KeycloakAuthenticationError, KeycloakGetError, KeycloakPostError
+from pyecotrend_ista.const import PROVIDER_URL, TIMEOUT
+from pyecotrend_ista.exception_classes import KeycloakCodeNotFound
+from pyecotrend_ista.login_helper import _RETRY, LoginHelper, _find_form_action, _JitteredRetry, raise_error_from_response
+from tests.conftest import TEST_EMAIL, TEST_PASSWORD
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_get_token(login_helper: LoginHelper) -> None:
+    """Test `get_token` method."""
+
+    assert login_helper.get_token()["access_token"] == "ACCESS_TOKEN"
+    assert login_helper.auth_code == "AUTH_CODE"
+
+
+@pytest.mark.parametrize(
+    ("totp", "expected_suffix"),
+    [(None, b""), ("123 456", b"&totp=123+456")],
+)
+def test_get_token_body(mock_requests_login: RequestsMock, totp: str | None, expected_suffix: bytes) -> None:
+    """Test the form body posted to the token endpoint by `get_token`."""
+
+    LoginHelper(username=TEST_EMAIL, password=TEST_PASSWORD, totp=totp).get_token()
+
+    assert mock_requests_login.last_request.headers["Content-Type"] == "application/x-www-form-urlencoded"
+    assert mock_requests_login.last_request.body == (
+        b"grant_type=authorization_code&client_id=ecotrend"
+        b"&redirect_uri=https%3A%2F%2Fecotrend.ista.de%2Flogin-redirect&code=AUTH_CODE" + expected_suffix
+    )
+
+
+@pytest.mark.parametrize(
+    ("endpoint", "method", "status_code", "expected_exception"),
+    [
+        ("auth", "get", HTTPStatus.BAD_REQUEST, KeycloakGetError),
+        ("auth", "get", HTTPStatus.UNAUTHORIZED, KeycloakAuthenticationError),
+        ("token", "post", HTTPStatus.BAD_REQUEST, KeycloakPostError),
+        ("token", "post", HTTPStatus.INTERNAL_SERVER_ERROR, KeycloakPostError),
+    ],
+)
+def test_get_token_http_errors(
+    mock_requests_login: RequestsMock,
+    endpoint: str,
+    method: str,
+    status_code: HTTPStatus,
+    expected_exception,
+) -> None:
+    """Test http errors for method `get_token`."""
+
+    getattr(mock_requests_login, method)(PROVIDER_URL + endpoint, status_code=status_code, json={"message": "error"})
+
+    with pytest.raises(expected_exception=expected_exception, match="error"):
+        LoginHelper(username=TEST_EMAIL, password=TEST_PASSWORD).get_token()
+
+
+@pytest.mark.parametrize(
+    ("action", "expected_action"),
+    [
+        ("https://keycloak.ista.com/login?a=1&amp;b=2", "https://keycloak.ista.com/login?a=1&b=2"),
+        ("https://keycloak.ista.com/login", "https://keycloak.ista.com/login"),
+    ],
+)
+def test_get_form_action(login_helper: LoginHelper, requests_mock: RequestsMock, action: str, expected_action: str) -> None:
+    """Test form action extraction of method `_get_form_action`."""
+
+    requests_mock.get(
+        PROVIDER_URL + "auth",
+        text=f'<form id="kc-form-login" action="{action}" method="post">',
+        headers={"Set-Cookie": "AUTH_SESSION_ID=xxxxx; Path=/"},
+    )
+
+    assert login_helper._get_form_action() == expected_action  # pylint: disable=W0212
+    assert requests_mock.last_request.url == (
+        PROVIDER_URL + "auth?response_mode=fragment&response_type=code&client_id=ecotrend&scope=openid"
+        "&redirect_uri=https%3A%2F%2Fecotrend.ista.de%2Flogin-redirect"
+    )
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_refresh_token(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test `refresh_token` method."""
+
+    assert login_helper.refresh_token("OLD/REFRESH+TOKEN") == ("ACCESS_TOKEN", 60, "REFRESH_TOKEN")
+    assert mock_requests_login.last_request.headers["Content-Type"] == "application/x-www-form-urlencoded"
+    assert mock_requests_login.last_request.body == (
+        b"grant_type=refresh_token&client_id=ecotrend&refresh_token=OLD%2FREFRESH%2BTOKEN"
+    )
+
+
+@pytest.mark.parametrize("expires_in", [300, 30, 10])
+def test_refresh_token_cached(login_helper: LoginHelper, requests_mock: RequestsMock, expires_in: int) -> None:
+    """Test that `refresh_token` reuses the result of a refresh while the access token is valid."""
+
+    token_mock = requests_mock.post(
+        PROVIDER_URL + "token",
+        json={"access_token": "ACCESS_TOKEN", "expires_in": expires_in, "refresh_token": "NEW_REFRESH_TOKEN"},
+    )
+
+    assert login_helper.refresh_token("REFRESH_TOKEN") == ("ACCESS_TOKEN", expires_in, "NEW_REFRESH_TOKEN")
+    access_token, remaining, refresh_token = login_helper.refresh_token("REFRESH_TOKEN")
+    assert (access_token, refresh_token) == ("ACCESS_TOKEN", "NEW_REFRESH_TOKEN")
+    assert expires_in - 1 <= remaining <= expires_in
+    assert token_mock.call_count == 1
+
+
+def test_refresh_token_cached_remaining_lifetime(login_helper: LoginHelper, requests_mock: RequestsMock) -> None:
+    """Test that tokens served from the cache report their remaining lifetime."""
+
+    token_mock = requests_mock.post(
+        PROVIDER_URL + "token",
+        json={"access_token": "ACCESS_TOKEN", "expires_in": 300, "refresh_token": "NEW_REFRESH_TOKEN"},
+    )
+    login_helper.refresh_token("REFRESH_TOKEN")
+
+    # Let 200 seconds pass
+    expires_at, stale_at, *tokens = login_helper._refresh_cache["REFRESH_TOKEN"]  # pylint: disable=W0212
+    login_helper._refresh_cache["REFRESH_TOKEN"] = (expires_at - 200, stale_at - 200, *tokens)  # pylint: disable=W0212
+
+    _, remaining, _ = login_helper.refresh_token("REFRESH_TOKEN")
+    assert 99 <= remaining <= 100
+    assert token_mock.call_count == 1
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_logout_clears_refresh_cache(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test that tokens of a logged out session are not served from the cache."""
+
+    login_helper.refresh_token("REFRESH_TOKEN")
+    login_helper.logout("REFRESH_TOKEN")
+    login_helper.refresh_token("REFRESH_TOKEN")
+
+    assert [r.url for r in mock_requests_login.request_history].count(PROVIDER_URL + "token") == 2
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_logout(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test `logout` method."""
+
+    assert login_helper.logout("REFRESH_TOKEN") == {}
+    assert mock_requests_login.last_request.body == b"client_id=ecotrend&refresh_token=REFRESH_TOKEN"
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_default_timeout(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test that requests without an explicit timeout use the default timeout."""
+
+    mock_requests_login.get(PROVIDER_URL + "userinfo", json={"sub": "SUB"})
+
+    assert login_helper.userinfo("ACCESS_TOKEN") == {"sub": "SUB"}
+    assert mock_requests_login.last_request.timeout == TIMEOUT
+
+
+@pytest.mark.parametrize(
+    ("content", "expected_action"),
+    [
+        (b'<html><form id="kc-form-login" action="https://a/b?c=1&amp;d=2"></form>', "https://a/b?c=1&d=2"),
+        (b'<form method="get"></form>\n<FORM\n  id="kc-form-login"\n  action="https://a/b">', "https://a/b"),
+        (b"<form data-action='x' action='https://a/b?c=1&amp;d=2'>", "https://a/b?c=1&d=2"),
+        (b'<form id="kc-form-login" action = "https://a/b?c=1&amp;d=2">', "https://a/b?c=1&d=2"),
+        ('<form action="https://a/b?name=J\u00fcrgen">'.encode(), "https://a/b?name=J\u00fcrgen"),
+        ("<form action='https://a/b?name=J\u00fcrgen'>".encode(), "https://a/b?name=J\u00fcrgen"),
+        (b"<form action='https://a/first'></form><form action=\"https://a/second\">", "https://a/first"),
+        (b'<form action=https://a/first></form><form action="https://a/second">', "https://a/first"),
+        (b'<form action=""></form><form action="https://a/second">', "https://a/second"),
+        (b'<!-- <form action="https://a/old"> --><form action="https://a/new">', "https://a/new"),
+        (b'<script>let f = \'<form action="https://a/old">\';</script><form action="https://a/new">', "https://a/new"),
+        (b"<html><body>no form</body></html>", None),
+    ],
+)
+def test_find_form_action(content: bytes, expected_action: str | None) -> None:
+    """Test `_find_form_action` helper."""
+
+    assert _find_form_action(content) == expected_action
+
+
+@pytest.mark.parametrize(
+    ("status_code", "decode_json", "expected_result"),
+    [
+        (HTTPStatus.OK, True, {"key": "value"}),
+        (HTTPStatus.OK, False, b'{"key": "value"}'),
+        (HTTPStatus.NO_CONTENT, False, {}),
+    ],
+)
+def test_raise_error_from_response_success(
+    requests_mock: RequestsMock, status_code: HTTPStatus, decode_json: bool, expected_result
+) -> None:
+    """Test success path of `raise_error_from_response`."""
+
+    requests_mock.get(PROVIDER_URL, status_code=status_code, text='{"key": "value"}')
+
+    response = requests.get(PROVIDER_URL, timeout=10)
+    assert raise_error_from_response(response, KeycloakGetError, decode_json=decode_json) == expected_result
+
+
+def test_retry_backoff_jitter() -> None:
+    """Test that the retry backoff is randomized up to the exponential backoff."""
+
+    retry = _RETRY.new(history=(RequestHistory("GET", PROVIDER_URL, None, HTTPStatus.SERVICE_UNAVAILABLE, None),) * 3)
+
+    assert isinstance(retry, _JitteredRetry)
+    assert all(0 <= retry.get_backoff_time() <= 1.2 for _ in range(100))
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "expected_delay"), [("1", 1.0), ("3600", 2.0), ("Fri, 31 Dec 9999 23:59:59 GMT", 2.0)]
+)
+def test_retry_after_capped(retry_after: str, expected_delay: float) -> None:
+    """Test that the delay requested by a Retry-After header is capped."""
+
+    response = HTTPResponse(status=HTTPStatus.SERVICE_UNAVAILABLE, headers={"Retry-After": retry_after})
+
+    assert _RETRY.get_retry_after(response) == expected_delay
+
+
+def test_session_not_reconfigured() -> None:
+    """Test that a session passed in is used without changing its configuration."""
+
+    session = requests.Session()
+    session.verify = "/path/to/ca-bundle.pem"
+    adapter = session.get_adapter(PROVIDER_URL)
+
+    login_helper = LoginHelper(username=TEST_EMAIL, password=TEST_PASSWORD, session=session)
+
+    assert login_helper.session is session
+    assert session.verify == "/path/to/ca-bundle.pem"
+    assert session.get_adapter(PROVIDER_URL) is adapter
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate",
+        PROVIDER_URL + "token",
+        PROVIDER_URL + "logout",
+    ],
+)
+def test_post_not_retried(login_helper: LoginHelper, url: str) -> None:
+    """Test that POST requests are only retried on connection errors."""
+
+    retry = login_helper.session.get_adapter(url).max_retries
+
+    for status in (HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.SERVICE_UNAVAILABLE):
+        assert not retry.is_retry("POST", status)
+        assert retry.is_retry("GET", status)
+    with pytest.raises(ReadTimeoutError):
+        retry.increment("POST", url, error=ReadTimeoutError(None, url, "read timed out"))
+    assert retry.increment("POST", url, error=ConnectTimeoutError()).total == retry.total - 1
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_get_auth_code_follows_login_form(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test that credentials are submitted to a login form rendered in response to the first submission."""
+
+    first_form = mock_requests_login.post(
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate",
+        text='<form id="kc-form-login" action="https://keycloak.ista.com/realms/eed-prod/login-actions/second" method="post">',
+    )
+    second_form = mock_requests_login.post(
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/second",
+        status_code=HTTPStatus.FOUND,
+        headers={"Location": "https://ecotrend.ista.de/login-redirect#state=STATE&code=AUTH_CODE"},
+    )
+
+    assert login_helper._get_auth_code() == "AUTH_CODE"  # pylint: disable=W0212
+    assert first_form.call_count == 1
+    assert second_form.call_count == 1
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_get_auth_code_invalid_credentials(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test that credentials are not submitted again if Keycloak reports them as invalid."""
+
+    form = mock_requests_login.post(
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate",
+        text='<form id="kc-form-login" action="https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate'
+        '?session_code=NEW_SESSION_CODE&amp;execution=EXECUTION&amp;client_id=ecotrend&amp;tab_id=TAB_ID">'
+        '<span id="input-error" aria-live="polite">Invalid username or password.</span>',
+    )
+
+    with pytest.raises(KeycloakAuthenticationError, match="Invalid username or password"):
+        login_helper._get_auth_code()  # pylint: disable=W0212
+    assert form.call_count == 1
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_get_auth_code_restarts_login(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test that the login is restarted once if Keycloak re-renders the same login form without an error."""
+
+    form = mock_requests_login.post(
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate",
+        [
+            {
+                "text": '<form id="kc-form-login" action="https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate'
+                '?session_code=NEW_SESSION_CODE&amp;execution=EXECUTION&amp;client_id=ecotrend&amp;tab_id=TAB_ID">'
+            },
+            {
+                "status_code": HTTPStatus.FOUND,
+                "headers": {"Location": "https://ecotrend.ista.de/login-redirect#state=STATE&code=AUTH_CODE"},
+            },
+        ],
+    )
+
+    assert login_helper._get_auth_code() == "AUTH_CODE"  # pylint: disable=W0212
+    assert form.call_count == 2
+    assert [request.method for request in mock_requests_login.request_history] == ["GET", "POST", "GET", "POST"]
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_get_auth_code_restarts_login_once(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test that the login is only restarted once if Keycloak keeps re-rendering the same login form."""
+
+    form = mock_requests_login.post(
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate",
+        text='<form id="kc-form-login" action="https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate'
+        '?session_code=NEW_SESSION_CODE&amp;execution=EXECUTION&amp;client_id=ecotrend&amp;tab_id=TAB_ID">',
+    )
+
+    with pytest.raises(KeycloakCodeNotFound):
+        login_helper._get_auth_code()  # pylint: disable=W0212
+    assert form.call_count == 2
+    assert [request.method for request in mock_requests_login.request_history] == ["GET", "POST", "GET", "POST"]
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_get_auth_code_gives_up(login_helper: LoginHelper, mock_requests_login: RequestsMock) -> None:
+    """Test that re-rendered login forms are only submitted a limited number of times."""
+
+    form = mock_requests_login.post(
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate",
+        [
+            {"text": f'<form action="https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate?execution={i}">'}
+            for i in range(3)
+        ],
+    )
+
+    with pytest.raises(KeycloakCodeNotFound):
+        login_helper._get_auth_code()  # pylint: disable=W0212
+    assert form.call_count == 3
+
+
+@pytest.mark.parametrize(
+    ("location", "expected_code"),
+    [
+        ("https://ecotrend.ista.de/login-redirect#state=STATE&session_state=SESSION_STATE&code=AUTH_CODE", "AUTH_CODE"),
+        ("https://ecotrend.ista.de/login-redirect#code=AUTH%2ECODE&state=STATE", "AUTH.CODE"),
+        ("https://ecotrend.ista.de/login-redirect?code=QUERY_CODE#state=STATE", None),
+        ("https://ecotrend.ista.de/login-redirect#state=STATE&code=", None),
+    ],
+)
+def test_get_auth_code_from_location(
+    login_helper: LoginHelper, mock_requests_login: RequestsMock, location: str, expected_code: str | None
+) -> None:
+    """Test extraction of the authentication code from the redirect location."""
+
+    mock_requests_login.post(
+        "https://keycloak.ista.com/realms/eed-prod/login-actions/authenticate",
+        status_code=HTTPStatus.FOUND,
+        headers={"Location": location},
+    )
+
+    if expected_code is None:
+        with pytest.raises(KeycloakCodeNotFound):
+            login_helper._get_auth_code()  # pylint: disable=W0212
+    else:
+        assert login_helper._get_auth_code() == expected_code  # pylint: disable=W0212
+
+
+@pytest.mark.parametrize(
+    ("text", "expected_message"),
+    [
+        ('{"message": "error"}', "error"),
+        ('{"error": "invalid_grant"}', b'{"error": "invalid_grant"}'),
+        ('["error"]', b'["error"]'),
+        ("<html>Internal Server Error</html>", b"<html>Internal Server Error</html>"),
+    ],
+)
+def test_raise_error_from_response_error(requests_mock: RequestsMock, text: str, expected_message) -> None:
+    """Test error path of `raise_error_from_response`."""
+
+    requests_mock.get(PROVIDER_URL, status_code=HTTPStatus.INTERNAL_SERVER_ERROR, text=text)
+    response = requests.get(PROVIDER_URL, timeout=10)
+
+    with pytest.raises(KeycloakGetError) as exc_info:
+        raise_error_from_response(response, KeycloakGetError)
+    assert exc_info.value.error_message == expected_message
+    assert exc_info.value.response_code == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert exc_info.value.response_body == text.encode()
@@ -4,11 +4,13 @@
 from typing import cast
 
 import pytest
+from requests_mock.mocker import Mocker as RequestsMock
 from syrupy.assertion import SnapshotAssertion
 
 from pyecotrend_ista import PyEcotrendIsta
-from pyecotrend_ista.const import VERSION
+from pyecotrend_ista.const import API_BASE_URL, PROVIDER_URL, VERSION
 from pyecotrend_ista.types import AccountResponse
+from tests.conftest import DEMO_EMAIL, TEST_EMAIL, TEST_PASSWORD
 
 
 def test_get_uuids(ista_client: PyEcotrendIsta) -> None:
@@ -52,6 +54,58 @@ def test_get_support_code_returns_none(ista_client: PyEcotrendIsta) -> None:
     assert ista_client.get_support_code() is None
 
 
+@pytest.mark.parametrize(
+    ("expires_in", "elapsed", "expected_call_count"),
+    [(60, 29, 1), (60, 31, 2), (30, 0, 1), (30, 14, 1), (30, 16, 2)],
+)
+def test_access_token_refresh(
+    ista_client: PyEcotrendIsta, mock_requests_login: RequestsMock, expires_in: int, elapsed: int, expected_call_count: int
+) -> None:
+    """Test that `access_token` is refreshed once it has expired."""
+
+    mock_requests_login.post(
+        PROVIDER_URL + "token",
+        json={"access_token": "ACCESS_TOKEN", "expires_in": expires_in, "refresh_token": "REFRESH_TOKEN"},
+    )
+    ista_client.login()
+    assert ista_client.access_token == "ACCESS_TOKEN"
+    ista_client._access_token_deadline -= elapsed  # pylint: disable=W0212
+
+    assert ista_client.access_token == "ACCESS_TOKEN"
+    assert [r.url for r in mock_requests_login.request_history].count(PROVIDER_URL + "token") == expected_call_count
+
+
+@pytest.mark.usefixtures("mock_requests_login")
+def test_header_not_shared(ista_client: PyEcotrendIsta) -> None:
+    """Test that request headers are not shared between client instances."""
+
+    ista_client.login()
+
+    assert ista_client._header["Authorization"] == "Bearer ACCESS_TOKEN"  # pylint: disable=W0212
+    other_client = PyEcotrendIsta(email="user@example.com", password="password")
+    assert "Authorization" not in other_client._header  # pylint: disable=W0212
+
+
+@pytest.mark.parametrize("email", [TEST_EMAIL, DEMO_EMAIL])
+@pytest.mark.usefixtures("mock_requests_login")
+def test_api_request_headers(mock_requests_login: RequestsMock, email: str) -> None:
+    """Test that API requests use the User-Agent returned by `get_user_agent` and send no Content-Type."""
+
+    class CustomUserAgentIsta(PyEcotrendIsta):
+        """Client with a custom User-Agent."""
+
+        def get_user_agent(self) -> str:
+            """Return a custom User-Agent."""
+            return "CustomAgent/1.0"
+
+    CustomUserAgentIsta(email=email, password=TEST_PASSWORD).login()
+
+    api_requests = [r for r in mock_requests_login.request_history if r.url.startswith(API_BASE_URL)]
+    assert api_requests
+    assert all(r.headers["User-Agent"] == "CustomAgent/1.0" for r in api_requests)
+    assert all("Content-Type" not in r.headers for r in api_requests)
+
+
 @pytest.mark.parametrize(("access_token", "expected_result"), [("ACCESS_TOKEN", True), (None, False)])
 def test_is_connected(ista_client: PyEcotrendIsta, access_token: str | None, expected_result: bool) -> None:
     """Test `_is_connected` method."""